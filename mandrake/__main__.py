@@ -74,7 +74,7 @@ def get_options():
     other = parser.add_argument_group('Other')
     other.add_argument('--seed', type=int, default=1, help='Seed for random number generation')
     other.add_argument('--fp', type=int, choices=[32, 64], default=64,
-                        help='Floating point precision when using a GPU')
+                        help='Floating point precision of the embedding')
     other.add_argument('--version', action='version',
                        version='%(prog)s '+__version__)
 
@@ -205,7 +205,7 @@ def main():
         else:
           dbscan = True
           sys.stderr.write("Running clustering\n")
-          cluster_labels = runHDBSCAN(embedding_array)
+          cluster_labels = runHDBSCAN(embedding_array, args.cpus)
           write_hdbscan_clusters(cluster_labels, names, args.output)
 
     #***********************#
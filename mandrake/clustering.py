@@ -10,13 +10,15 @@ import numpy as np
 import pandas as pd
 
 
-def runHDBSCAN(embedding):
+def runHDBSCAN(embedding, threads=1):
     embedding_scaled = _scale_and_centre(embedding)
-    hdb = hdbscan.HDBSCAN(algorithm='boruvka_balltree',
+    # kd-trees are faster than ball trees for low dimensional data
+    hdb = hdbscan.HDBSCAN(algorithm='boruvka_kdtree',
                           min_cluster_size=2,
                           min_samples=2,
                           cluster_selection_epsilon=0.02,
-                          allow_single_cluster=True
+                          allow_single_cluster=True,
+                          core_dist_n_jobs=threads
                           ).fit(embedding_scaled)
     return hdb.labels_
 
@@ -6,40 +6,35 @@
 import re
 import numpy as np
 import pandas as pd
-from sklearn.neighbors import kneighbors_graph
 
 # C++ extensions
 import pp_sketchlib
+from SCE import jaccard
 
-from .pairsnp import runPairsnp
-from .sketchlib import get_kmer_sizes, get_seqs_in_db
+from .pairsnp import runPairsnp, count_sequences
+from .sketchlib import get_db_info
+from .sce import MIN_SAMPLES, check_min_samples
 
 
 def accessoryDists(accessory_file, kNN, threshold, cpus):
-    acc_mat = pd.read_csv(accessory_file, sep="\t", header=0, index_col=0)
+    # Read presence/absence as one byte per entry, rather than int64
+    samples = pd.read_csv(accessory_file, sep="\t", header=0, index_col=0,
+                          nrows=0).columns
+    acc_mat = pd.read_csv(accessory_file, sep="\t", header=0, index_col=0,
+                          dtype={sample: np.uint8 for sample in samples})
     names = list(acc_mat.columns)
+    check_min_samples(len(names))
 
-    if kNN <= 0:
-        kNN = len(names) - 1
+    I, J, dists = jaccard(packed=_pack_rows(acc_mat.values.T),
+                          knn=kNN,
+                          threshold=threshold,
+                          n_threads=cpus)
 
-    sp = kneighbors_graph(X=acc_mat.T, n_neighbors=kNN,
-                          metric='jaccard', mode='distance',
-                          include_self=False, n_jobs=cpus).tocoo()
-
-    if threshold > 0:
-        index = []
-        for i, d in enumerate(sp.data):
-            if d < threshold:
-                index.append(i)
-        index = np.array(index)
-        sp.row = sp.row[index]
-        sp.col = sp.col[index]
-        sp.data = sp.data[index]
-
-    return sp.row, sp.col, sp.data, names
+    return I, J, dists, names
 
 
 def pairSnpDists(alignment, threshold, kNN, cpus):
+    check_min_samples(count_sequences(alignment, max_count=MIN_SAMPLES))
     I, J, dists, names = runPairsnp(alignment,
                                     kNN=kNN,
                                     threshold=threshold,
@@ -48,8 +43,8 @@ def pairSnpDists(alignment, threshold, kNN, cpus):
 
 
 def sketchlibDists(sketch_db, dist_col, kNN, threshold, cpus, use_gpu, device_id):
-    names = get_seqs_in_db(sketch_db + ".h5")
-    kmers = get_kmer_sizes(sketch_db + ".h5")
+    names, kmers = get_db_info(sketch_db + ".h5")
+    check_min_samples(len(names))
 
     sketchlib_version = re.search(r"(\d+)\.(\d+)\.(\d+)", pp_sketchlib.version)
     if sketchlib_version and int(sketchlib_version.group(1)) >= 2:
@@ -94,3 +89,15 @@ def sketchlibDists(sketch_db, dist_col, kNN, threshold, cpus, use_gpu, device_id
                                                        device_id=device_id)
 
     return I, J, dists, names
+
+
+# Internal functions
+
+
+# Packs rows of a presence/absence matrix into 64-bit words for popcount
+def _pack_rows(presence):
+    packed = np.packbits(presence.astype(bool), axis=1)
+    pad = -packed.shape[1] % 8
+    if pad > 0:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view(np.uint64)
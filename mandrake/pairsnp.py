@@ -24,6 +24,32 @@ def read_fasta(fp):
         yield (name, "".join(seq))
 
 
+def count_sequences(msaFile, max_count=None):
+    """Counts the sequences in a multiple sequence file
+
+    Args:
+        msaFile (str)
+            Multiple sequence alignment
+        max_count (int)
+            Stop reading once this many sequences have been found (optional)
+
+    Returns:
+        n_seqs (int)
+            number of sequences in the file (up to max_count)
+    """
+    if not os.path.isfile(msaFile):
+        raise ValueError("MSA file does not exist!")
+
+    n_seqs = 0
+    with open(msaFile, "r") as infile:
+        for line in infile:
+            if line.startswith(">"):
+                n_seqs += 1
+                if max_count is not None and n_seqs >= max_count:
+                    break
+    return n_seqs
+
+
 def runPairsnp(msaFile, kNN=None, threshold=None, threads=1):
     """Runs pairsnp with the option of supplying a distance or kNN cutoff
 
@@ -43,7 +69,7 @@ def runPairsnp(msaFile, kNN=None, threshold=None, threads=1):
         J (np.array)
             integer array of column indices
         dist (np.array)
-            array of SNP distances
+            array of SNP distances, as a proportion of the alignment length
         names (list)
             list of sample names taken from the fasta headers
     """
@@ -67,6 +93,7 @@ def runPairsnp(msaFile, kNN=None, threshold=None, threads=1):
                                 n_threads=threads,
                                 dist=dist,
                                 knn=kNN)
-    dist = [float(x) / seq_len for x in dist]
+    # convert SNP counts to proportions in place
+    dist /= seq_len
 
     return (I, J, dist, names)
@@ -10,7 +10,6 @@ from functools import partial
 import pandas as pd
 import numpy as np
 from tqdm import tqdm
-import plotly.express as px
 import plotly.graph_objects as go
 
 import matplotlib as mpl
@@ -27,56 +26,66 @@ from .sound import encode_audio
 def plotSCE_html(embedding, names, labels, output_prefix, hover_labels=True, dbscan=True, seed=42):
     if dbscan:
         not_noise = labels != -1
-        not_noise_list = list(np.where(not_noise)[0])
         plot_df = pd.DataFrame({'SCE dimension 1': embedding[not_noise, 0],
                                 'SCE dimension 2': embedding[not_noise, 1],
-                                'names': [names[i] for i in not_noise_list],
-                                'Label': [str(labels[x]) for x in not_noise_list]})
+                                'names': np.asarray(names)[not_noise],
+                                'Label': labels[not_noise].astype(str)})
     else:
         plot_df = pd.DataFrame({'SCE dimension 1': embedding[:, 0],
                                 'SCE dimension 2': embedding[:, 1],
                                 'names': names,
-                                'Label': [str(x) for x in labels]})
-
-    random_colour_map = {}
+                                'Label': np.asarray(labels).astype(str)})
+
+    # Alternative approach with hsl representation
+    # from hsluv import hsluv_to_hex
+    # hue = rng.uniform(0, 360)
+    # saturation = rng.uniform(60, 100)
+    # luminosity = rng.uniform(50, 90)
+    # random_colour_map[label] = hsluv_to_hex([hue, saturation, luminosity])
+
+    # Random in rbg seems to give better contrast
+    # (drawn for all labels at once, which gives the same colours as
+    # drawing three at a time for each label in turn)
+    unique_labels = sorted(pd.unique(plot_df['Label']))
     rng = np.random.default_rng(seed=seed)
-    for label in sorted(pd.unique(plot_df['Label'])):
-        # Alternative approach with hsl representation
-        # from hsluv import hsluv_to_hex ## outside of loop
-        # hue = rng.uniform(0, 360)
-        # saturation = rng.uniform(60, 100)
-        # luminosity = rng.uniform(50, 90)
-        # random_colour_map[label] = hsluv_to_hex([hue, saturation, luminosity])
-
-        # Random in rbg seems to give better contrast
-        rgb = rng.integers(low=0, high=255, size=3)
-        random_colour_map[label] = ",".join(["rgb(" + str(rgb[0]),
-                                              str(rgb[1]),
-                                              str(rgb[2]) + ")"])
+    rgb = rng.integers(low=0, high=255, size=(len(unique_labels), 3))
+    random_colour_map = dict(zip(unique_labels,
+                                 ["rgb(" + ",".join(map(str, colour)) + ")"
+                                  for colour in rgb.tolist()]))
 
     # Plot clustered points
-    fig = px.scatter(plot_df, x="SCE dimension 1", y="SCE dimension 2",
-                     hover_name='names' if hover_labels else None,
-                     color='Label',
-                     color_discrete_map=random_colour_map,
-                     render_mode='webgl')
-    fig.layout.update(showlegend=False)
-    fig.update_traces(marker=dict(size=10,
-                             line=dict(width=2,
-                                       color='DarkSlateGrey')),
-                      text=plot_df['names'] if hover_labels else None,
-                      hoverinfo='text' if hover_labels else None,
-                      opacity=1.0,
-                      selector=dict(mode='markers'))
+    # (as a single trace, coloured per point, rather than one trace per label
+    # which each carried the full list of hover names)
+    fig = go.Figure(
+        go.Scattergl(
+            mode='markers',
+            x=plot_df['SCE dimension 1'],
+            y=plot_df['SCE dimension 2'],
+            customdata=plot_df['names'] if hover_labels else None,
+            hovertemplate='%{customdata}<extra></extra>' if hover_labels else None,
+            opacity=1.0,
+            marker=dict(
+                color=plot_df['Label'].map(random_colour_map),
+                size=10,
+                line=dict(width=2,
+                          color='DarkSlateGrey')
+            ),
+            showlegend=False
+        )
+    )
+    fig.layout.update(showlegend=False,
+                      xaxis_title='SCE dimension 1',
+                      yaxis_title='SCE dimension 2')
     if dbscan:
         # Plot noise points
+        noise = labels == -1
         fig.add_trace(
             go.Scattergl(
                 mode='markers',
-                x=embedding[labels == -1, 0],
-                y=embedding[labels == -1, 1],
-                text=[names[i] for i in list(np.where(labels == -1)[0])] if hover_labels else None,
-                hoverinfo='text' if hover_labels else None,
+                x=embedding[noise, 0],
+                y=embedding[noise, 1],
+                customdata=np.asarray(names)[noise] if hover_labels else None,
+                hovertemplate='%{customdata}<extra></extra>' if hover_labels else None,
                 opacity=0.5,
                 marker=dict(
                     color='black',
@@ -109,6 +118,7 @@ def plotSCE_hex(embedding, output_prefix):
     ax.set_xlabel('SCE dimension 1')
     ax.set_ylabel('SCE dimension 2')
     plt.savefig(output_prefix + ".embedding_density.pdf")
+    plt.close()
 
 # Matplotlib static plot, and animation if available
 def plotSCE_mpl(embedding, results, labels, output_prefix, sound=False,
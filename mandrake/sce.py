@@ -6,31 +6,33 @@ and loading results'''
 
 import sys
 import os
+import zipfile
 from functools import partial
 import numpy as np
 import pandas as pd
 
 # C++ extensions
-from SCE import wtsne
+from SCE import wtsne, wtsne_fp32
 try:
     from SCE import wtsne_gpu_fp64, wtsne_gpu_fp32
     gpu_fn_available = True
 except ImportError:
     gpu_fn_available = False
 
-# from .utils import distVec, distVecCutoff
-
 # Run exits if fewer samples than this
 MIN_SAMPLES = 100
 
 
-def save_input(I, J, dists, names, output_prefix):
-    if (len(names) < MIN_SAMPLES):
+# Called with the number of samples before distances are calculated
+def check_min_samples(n_samples):
+    if (n_samples < MIN_SAMPLES):
         sys.stderr.write(
             "Less than minimum number of samples used (" + str(MIN_SAMPLES) + ")\n")
-        sys.stderr.write("Distances calculated, but not running SCE\n")
+        sys.stderr.write("Not calculating distances or running SCE\n")
         sys.exit(1)
 
+
+def save_input(I, J, dists, names, output_prefix):
     pd.Series(names).to_csv(output_prefix + '.names.txt',
                             sep='\n', header=False, index=False)
 
@@ -38,11 +40,12 @@ def save_input(I, J, dists, names, output_prefix):
 
 
 def loadIJdist(npzfilename):
-    npzfile = np.load(npzfilename)
-    I = npzfile['I']
-    J = npzfile['J']
-    dists = npzfile['dists']
-    names = npzfile['names']
+    # NB: mmap_mode has no effect on .npz files, so arrays are read in full
+    with np.load(npzfilename) as npzfile:
+        I = npzfile['I']
+        J = npzfile['J']
+        dists = npzfile['dists']
+        names = npzfile['names']
     return I, J, dists, names
 
 
@@ -50,14 +53,14 @@ def runSCE(I, J, dists, weight_file, names, SCE_opts):
     weights = np.ones((len(names)))
     if weight_file:
         weights_in = pd.read_csv(weight_file, sep="\t", header=None, index_col=0)
-        if (len(weights_in.index.symmetric_difference(names)) > 0):
+        weight_map = dict(zip(weights_in.index, weights_in[1].values))
+        if weight_map.keys() != set(names):
             sys.stderr.write(
                 "Names in weights do not match sequences - using equal weights\n")
         else:
-            intersecting_samples = weights_in.index.intersection(names)
-            weights = weights_in.loc[intersecting_samples] # pandas df
-            weights = weights[1].values # to get as numpy vector
-    weights = list(weights)
+            # look up in the order of names, which may differ from the file
+            weights = np.fromiter((weight_map[name] for name in names),
+                                  dtype=np.float64, count=len(names))
 
     # Set up function call with either CPU or GPU
     maxIter = SCE_opts['maxIter'] // SCE_opts['n_workers']
@@ -80,8 +83,15 @@ def runSCE(I, J, dists, weight_file, names, SCE_opts):
                              device_id=SCE_opts['device_id'],
                              seed=SCE_opts['seed'])
     else:
+        if SCE_opts['use_gpu']:
+            sys.stderr.write("SCE was not compiled with CUDA, "
+                             "so cannot run on GPU\n")
         sys.stderr.write("Running on CPU\n")
-        wtsne_call = partial(wtsne,
+        if SCE_opts['fp'] == 64:
+            wtsne_cpu = wtsne
+        elif SCE_opts['fp'] == 32:
+            wtsne_cpu = wtsne_fp32
+        wtsne_call = partial(wtsne_cpu,
                              perplexity=SCE_opts['perplexity'],
                              maxIter=maxIter,
                              nRepuSamp=SCE_opts['nRepuSamp'],
@@ -114,4 +124,19 @@ def write_dot(embedding, labels, output_prefix):
 
 
 def _saveDists(output_prefix, I, J, dists, names):
-    np.savez(output_prefix, I=I, J=J, dists=dists, names=np.array(names))
+    # Indices are stored in the smallest type which can hold them
+    index_type = np.uint32 if len(names) <= np.iinfo(np.uint32).max else np.uint64
+    # Written one array at a time (uncompressed, as np.savez) so that only
+    # one converted copy of the indices is held in memory
+    with zipfile.ZipFile(output_prefix + ".npz", mode="w",
+                         compression=zipfile.ZIP_STORED,
+                         allowZip64=True) as npzfile:
+        _saveArray(npzfile, 'I', np.asarray(I, dtype=index_type))
+        _saveArray(npzfile, 'J', np.asarray(J, dtype=index_type))
+        _saveArray(npzfile, 'dists', np.asarray(dists))
+        _saveArray(npzfile, 'names', np.array(names))
+
+
+def _saveArray(npzfile, key, array):
+    with npzfile.open(key + ".npy", mode="w", force_zip64=True) as npyfile:
+        np.lib.format.write_array(npyfile, array, allow_pickle=False)
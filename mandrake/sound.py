@@ -32,13 +32,6 @@ def encode_audio(results, video_file, total_duration, sample_rate=44100, threads
     y_audio = _freq_to_wave(list(freqs[:, 1]), total_duration, sample_rate, threads)
     audio = np.column_stack((x_audio, y_audio))
 
-    x_audio = np.array(gen_audio(list(freqs[:, 0]), total_duration, sample_rate, threads))
-    x_audio *= np.iinfo(np.int16).max / np.max(np.abs(x_audio))
-    x_audio = x_audio.astype(np.int16, copy=False)
-    y_audio = np.array(gen_audio(list(freqs[:, 1]), total_duration, sample_rate, threads))
-    y_audio *= np.iinfo(np.int16).max / np.max(np.abs(y_audio))
-    y_audio = y_audio.astype(np.int16, copy=False)
-
     # Save the audio as an uncompressed WAV
     wav_tmp = mkstemp(suffix=".wav")[1]
     write_wav(wav_tmp, sample_rate, audio)
@@ -0,0 +1,261 @@
+#pragma once
+
+#include <algorithm>
+#include <chrono>
+#include <cstdint>
+#include <iostream>
+#include <tuple>
+#include <utility>
+#include <vector>
+
+#include <pybind11/numpy.h>
+
+#include "progress.hpp"
+#include "vector_norm.hpp"
+
+namespace py = pybind11;
+
+// Rows are presence/absence bits packed into 64-bit words
+using packed_rows =
+    py::array_t<uint64_t, py::array::c_style | py::array::forcecast>;
+
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#define JACCARD_X86_DISPATCH
+#include <immintrin.h>
+#endif
+
+// Counts of bits set in (a & b) and (a | b) across a pair of packed rows
+struct popcounts {
+  uint64_t intersect;
+  uint64_t total;
+};
+using popcount_fn = popcounts (*)(const uint64_t *, const uint64_t *,
+                                  const size_t);
+
+// Portable version (may not compile to a popcnt instruction)
+inline popcounts popcount_pair(const uint64_t *a, const uint64_t *b,
+                               const size_t n_words) {
+  popcounts counts = {0, 0};
+  for (size_t w = 0; w < n_words; ++w) {
+    counts.intersect += __builtin_popcountll(a[w] & b[w]);
+    counts.total += __builtin_popcountll(a[w] | b[w]);
+  }
+  return counts;
+}
+
+#ifdef JACCARD_X86_DISPATCH
+// Versions for specific instruction sets, chosen at runtime by
+// select_popcount() so the extension still runs on older CPUs
+
+// Scalar, using the popcnt instruction
+__attribute__((target("popcnt"))) inline popcounts
+popcount_pair_popcnt(const uint64_t *a, const uint64_t *b,
+                     const size_t n_words) {
+  popcounts counts = {0, 0};
+  for (size_t w = 0; w < n_words; ++w) {
+    counts.intersect += _mm_popcnt_u64(a[w] & b[w]);
+    counts.total += _mm_popcnt_u64(a[w] | b[w]);
+  }
+  return counts;
+}
+
+// AVX2: popcount of each nibble by table lookup with vpshufb, then summed
+// into 64-bit lanes (Mula, Kurz & Lemire 2018)
+__attribute__((target("avx2"))) inline __m256i popcount_avx2(__m256i v) {
+  const __m256i lookup =
+      _mm256_setr_epi8(0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4, 0, 1,
+                       1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4);
+  const __m256i low_mask = _mm256_set1_epi8(0x0f);
+  const __m256i lo = _mm256_and_si256(v, low_mask);
+  const __m256i hi = _mm256_and_si256(_mm256_srli_epi16(v, 4), low_mask);
+  const __m256i counts = _mm256_add_epi8(_mm256_shuffle_epi8(lookup, lo),
+                                         _mm256_shuffle_epi8(lookup, hi));
+  return _mm256_sad_epu8(counts, _mm256_setzero_si256());
+}
+
+__attribute__((target("avx2,popcnt"))) inline popcounts
+popcount_pair_avx2(const uint64_t *a, const uint64_t *b,
+                   const size_t n_words) {
+  __m256i intersect = _mm256_setzero_si256();
+  __m256i total = _mm256_setzero_si256();
+  size_t w = 0;
+  for (; w + 4 <= n_words; w += 4) {
+    const __m256i a_w =
+        _mm256_loadu_si256(reinterpret_cast<const __m256i *>(a + w));
+    const __m256i b_w =
+        _mm256_loadu_si256(reinterpret_cast<const __m256i *>(b + w));
+    intersect = _mm256_add_epi64(
+        intersect, popcount_avx2(_mm256_and_si256(a_w, b_w)));
+    total = _mm256_add_epi64(total, popcount_avx2(_mm256_or_si256(a_w, b_w)));
+  }
+  alignas(32) uint64_t intersect_lanes[4], total_lanes[4];
+  _mm256_store_si256(reinterpret_cast<__m256i *>(intersect_lanes), intersect);
+  _mm256_store_si256(reinterpret_cast<__m256i *>(total_lanes), total);
+  popcounts counts = {
+      intersect_lanes[0] + intersect_lanes[1] + intersect_lanes[2] +
+          intersect_lanes[3],
+      total_lanes[0] + total_lanes[1] + total_lanes[2] + total_lanes[3]};
+  for (; w < n_words; ++w) {
+    counts.intersect += _mm_popcnt_u64(a[w] & b[w]);
+    counts.total += _mm_popcnt_u64(a[w] | b[w]);
+  }
+  return counts;
+}
+
+// AVX-512: one popcount per 64-bit lane with vpopcntq, masked load for the
+// remaining words
+__attribute__((target("avx512f,avx512vpopcntdq"))) inline popcounts
+popcount_pair_avx512(const uint64_t *a, const uint64_t *b,
+                     const size_t n_words) {
+  __m512i intersect = _mm512_setzero_si512();
+  __m512i total = _mm512_setzero_si512();
+  size_t w = 0;
+  for (; w + 8 <= n_words; w += 8) {
+    const __m512i a_w = _mm512_loadu_si512(a + w);
+    const __m512i b_w = _mm512_loadu_si512(b + w);
+    intersect = _mm512_add_epi64(
+        intersect, _mm512_popcnt_epi64(_mm512_and_si512(a_w, b_w)));
+    total = _mm512_add_epi64(total,
+                             _mm512_popcnt_epi64(_mm512_or_si512(a_w, b_w)));
+  }
+  if (w < n_words) {
+    const __mmask8 tail = static_cast<__mmask8>((1U << (n_words - w)) - 1);
+    const __m512i a_w = _mm512_maskz_loadu_epi64(tail, a + w);
+    const __m512i b_w = _mm512_maskz_loadu_epi64(tail, b + w);
+    intersect = _mm512_add_epi64(
+        intersect, _mm512_popcnt_epi64(_mm512_and_si512(a_w, b_w)));
+    total = _mm512_add_epi64(total,
+                             _mm512_popcnt_epi64(_mm512_or_si512(a_w, b_w)));
+  }
+  popcounts counts = {
+      static_cast<uint64_t>(_mm512_reduce_add_epi64(intersect)),
+      static_cast<uint64_t>(_mm512_reduce_add_epi64(total))};
+  return counts;
+}
+#endif
+
+// Pick the fastest popcount available on this CPU
+inline popcount_fn select_popcount() {
+#ifdef JACCARD_X86_DISPATCH
+  __builtin_cpu_init();
+  if (__builtin_cpu_supports("avx512f") &&
+      __builtin_cpu_supports("avx512vpopcntdq")) {
+    return &popcount_pair_avx512;
+  } else if (__builtin_cpu_supports("avx2") &&
+             __builtin_cpu_supports("popcnt")) {
+    return &popcount_pair_avx2;
+  } else if (__builtin_cpu_supports("popcnt")) {
+    return &popcount_pair_popcnt;
+  }
+#endif
+  return &popcount_pair;
+}
+
+// Jaccard distance from the counts (as in scipy, rows with no
+// presence at all have a distance of zero)
+inline double jaccard_distance(const popcounts &counts) {
+  return counts.total == 0
+             ? 0.0
+             : static_cast<double>(counts.total - counts.intersect) /
+                   counts.total;
+}
+
+inline std::tuple<std::vector<uint64_t>, std::vector<uint64_t>,
+                  std::vector<double>>
+jaccard(const packed_rows &packed, int knn, const double threshold,
+        const int n_threads) {
+  if (knn > 0 && threshold > 0) {
+    throw std::runtime_error("Specify only one of knn or threshold");
+  }
+  if (packed.ndim() != 2) {
+    throw std::runtime_error("Packed rows must be a 2D array");
+  }
+
+  using namespace std::literals;
+  const auto start = std::chrono::steady_clock::now();
+
+  const uint64_t n_samples = packed.shape(0);
+  const size_t n_words = packed.shape(1);
+  const uint64_t *rows = packed.data();
+  const popcount_fn popcount = select_popcount();
+  knn = knn >= (long)n_samples ? n_samples - 1 : knn;
+
+  // Set up progress meter
+  static const uint64_t n_progress_ticks = 1000;
+  uint64_t update_every = 1;
+  if (n_samples > n_progress_ticks) {
+    update_every = n_samples / n_progress_ticks;
+  }
+  ProgressMeter dist_progress(n_progress_ticks, true);
+  int progress = 0;
+
+  // Shared variables for openmp loop
+  std::vector<std::vector<uint64_t>> cols(n_samples);
+  std::vector<std::vector<double>> distances(n_samples);
+  uint64_t len = 0;
+  bool interrupt = false;
+
+#pragma omp parallel for schedule(static) reduction(+:len) num_threads(n_threads)
+  for (uint64_t i = 0; i < n_samples; i++) {
+    // Cannot throw in an openmp block, short circuit instead
+    if (interrupt || PyErr_CheckSignals() != 0) {
+      interrupt = true;
+    } else {
+      std::vector<std::pair<double, uint64_t>> row_dists;
+      row_dists.reserve(n_samples - 1);
+      for (uint64_t j = 0; j < n_samples; j++) {
+        if (j != i) {
+          const double dist = jaccard_distance(
+              popcount(rows + i * n_words, rows + j * n_words, n_words));
+          if (threshold <= 0 || dist < threshold) {
+            row_dists.push_back(std::make_pair(dist, j));
+          }
+        }
+      }
+
+      // if using knn keep the closest, with ties broken by index
+      if (knn > 0) {
+        std::partial_sort(row_dists.begin(), row_dists.begin() + knn,
+                          row_dists.end());
+        row_dists.resize(knn);
+      }
+
+      // output distances
+      cols[i].reserve(row_dists.size());
+      distances[i].reserve(row_dists.size());
+      for (auto &dist_j : row_dists) {
+        distances[i].push_back(dist_j.first);
+        cols[i].push_back(dist_j.second);
+      }
+      len += distances[i].size();
+
+      if (i % update_every == 0) {
+#pragma omp critical
+        dist_progress.tick_count(++progress);
+      }
+    }
+  }
+
+  // Finalise
+  if (interrupt) {
+    check_interrupts();
+  } else {
+    dist_progress.finalise();
+  }
+
+  // Combine the lists from each thread
+  std::vector<double> distances_all = combine_vectors(distances, len);
+  std::vector<uint64_t> cols_all = combine_vectors(cols, len);
+  std::vector<uint64_t> rows_all(len);
+  auto rows_it = rows_all.begin();
+  for (uint64_t i = 0; i < n_samples; ++i) {
+    std::fill_n(rows_it, distances[i].size(), i);
+    rows_it += distances[i].size();
+  }
+
+  const auto end = std::chrono::steady_clock::now();
+  std::cerr << "Jaccard distances took " << (end - start) / 1s << "s"
+            << std::endl;
+
+  return std::make_tuple(rows_all, cols_all, distances_all);
+}
@@ -1,5 +1,6 @@
 #pragma once
 
+#include <algorithm>
 #include <chrono>
 #include <iostream>
 #include <stdio.h>
@@ -8,21 +9,10 @@
 
 #include "kseq.h"
 #include "progress.hpp"
+#include "vector_norm.hpp"
 
 #include <boost/dynamic_bitset.hpp>
 
-template <typename T>
-std::vector<T> combine_vectors(const std::vector<std::vector<T>> &vec,
-                               const size_t len) {
-  std::vector<T> all(len);
-  auto all_it = all.begin();
-  for (size_t i = 0; i < vec.size(); ++i) {
-    std::copy(vec[i].cbegin(), vec[i].cend(), all_it);
-    all_it += vec[i].size();
-  }
-  return all;
-}
-
 KSEQ_INIT(gzFile, gzread)
 
 inline std::tuple<std::vector<uint64_t>, std::vector<uint64_t>,
@@ -187,7 +177,8 @@ pairsnp(const char *fasta, int n_threads, int dist, int knn) {
   int progress = 0;
 
   // Shared variables for openmp loop
-  std::vector<std::vector<uint64_t>> rows(n_seqs);
+  // (row indices are implicit in the position in these vectors, so are
+  // only expanded when the rows are combined)
   std::vector<std::vector<uint64_t>> cols(n_seqs);
   std::vector<std::vector<double>> distances(n_seqs);
   uint64_t len = 0;
@@ -224,7 +215,6 @@ pairsnp(const char *fasta, int n_threads, int dist, int knn) {
       // output distances
       for (size_t j = 0; j < n_seqs; j++) {
         if ((row_dist_cutoff < 0) || (comp_snps[j] <= row_dist_cutoff)) {
-          rows[i].push_back(i);
           cols[i].push_back(j);
           distances[i].push_back(comp_snps[j]);
         }
@@ -247,8 +237,13 @@ pairsnp(const char *fasta, int n_threads, int dist, int knn) {
 
   // Combine the lists from each thread
   std::vector<double> distances_all = combine_vectors(distances, len);
-  std::vector<uint64_t> rows_all = combine_vectors(rows, len);
   std::vector<uint64_t> cols_all = combine_vectors(cols, len);
+  std::vector<uint64_t> rows_all(len);
+  auto rows_it = rows_all.begin();
+  for (uint64_t i = 0; i < n_seqs; ++i) {
+    std::fill_n(rows_it, distances[i].size(), i);
+    rows_it += distances[i].size();
+  }
 
   const auto end = std::chrono::steady_clock::now();
   std::cerr << "SNP distances took " << (end - start) / 1s << "s" << std::endl;
@@ -1,13 +1,83 @@
 // 2021 John Lees, Gerry Tonkin-Hill, Zhirong Yang
 // See LICENSE files
 
+#include "jaccard.hpp"
 #include "pairsnp.hpp"
 #include "sound.hpp"
 #include "wtsne.hpp"
 
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 namespace py = pybind11;
 
+// Hand a vector over to numpy without copying it into a python list
+template <typename T> py::array_t<T> vector_to_numpy(std::vector<T> &&vec) {
+  auto *vec_ptr = new std::vector<T>(std::move(vec));
+  py::capsule free_when_done(vec_ptr, [](void *ptr) {
+    delete reinterpret_cast<std::vector<T> *>(ptr);
+  });
+  return py::array_t<T>(vec_ptr->size(), vec_ptr->data(), free_when_done);
+}
+
+// Sparse distances are returned as (I, J, dists) numpy arrays
+py::tuple pairsnp_numpy(const char *fasta, int n_threads, int dist, int knn) {
+  auto result = pairsnp(fasta, n_threads, dist, knn);
+  return py::make_tuple(vector_to_numpy(std::move(std::get<0>(result))),
+                        vector_to_numpy(std::move(std::get<1>(result))),
+                        vector_to_numpy(std::move(std::get<2>(result))),
+                        std::get<3>(result));
+}
+
+py::tuple jaccard_numpy(const packed_rows &packed, int knn,
+                        const double threshold, const int n_threads) {
+  auto result = jaccard(packed, knn, threshold, n_threads);
+  return py::make_tuple(vector_to_numpy(std::move(std::get<0>(result))),
+                        vector_to_numpy(std::move(std::get<1>(result))),
+                        vector_to_numpy(std::move(std::get<2>(result))));
+}
+
+// Edges and weights are taken as numpy arrays (lists also accepted) and
+// copied into vectors in one step, rather than converted element-wise
+template <typename T>
+using numpy_vec = py::array_t<T, py::array::c_style | py::array::forcecast>;
+
+template <typename T> std::vector<T> numpy_to_vector(const numpy_vec<T> &arr) {
+  return std::vector<T>(arr.data(), arr.data() + arr.size());
+}
+
+template <typename real_t>
+std::shared_ptr<sce_results>
+wtsne_numpy(const numpy_vec<uint64_t> &I, const numpy_vec<uint64_t> &J,
+            const numpy_vec<real_t> &dists, const numpy_vec<real_t> &weights,
+            const real_t perplexity, const uint64_t maxIter,
+            const uint64_t nRepuSamp, const real_t eta0, const bool bInit,
+            const bool animated, const int n_workers, const int n_threads,
+            const unsigned int seed) {
+  std::vector<real_t> dist_vec = numpy_to_vector(dists);
+  std::vector<real_t> weight_vec = numpy_to_vector(weights);
+  return wtsne<real_t>(numpy_to_vector(I), numpy_to_vector(J), dist_vec,
+                       weight_vec, perplexity, maxIter, nRepuSamp, eta0, bInit,
+                       animated, n_workers, n_threads, seed);
+}
+
+#ifdef GPU_AVAILABLE
+template <typename real_t>
+std::shared_ptr<sce_results> wtsne_gpu_numpy(
+    const numpy_vec<uint64_t> &I, const numpy_vec<uint64_t> &J,
+    const numpy_vec<real_t> &dists, const numpy_vec<real_t> &weights,
+    const real_t perplexity, const uint64_t maxIter, const int block_size,
+    const int n_workers, const uint64_t nRepuSamp, const real_t eta0,
+    const bool bInit, const bool animated, const int cpu_threads,
+    const int device_id, const unsigned int seed) {
+  std::vector<real_t> dist_vec = numpy_to_vector(dists);
+  std::vector<real_t> weight_vec = numpy_to_vector(weights);
+  return wtsne_gpu<real_t>(numpy_to_vector(I), numpy_to_vector(J), dist_vec,
+                           weight_vec, perplexity, maxIter, block_size,
+                           n_workers, nRepuSamp, eta0, bInit, animated,
+                           cpu_threads, device_id, seed);
+}
+#endif
+
 PYBIND11_MODULE(SCE, m) {
   m.doc() = "Stochastic cluster embedding";
   m.attr("version") = VERSION_INFO;
@@ -23,18 +93,31 @@ PYBIND11_MODULE(SCE, m) {
            py::arg("frame"));
 
   // Exported functions
-  m.def("wtsne", &wtsne, py::return_value_policy::take_ownership,
+  // See note below on fp64/fp32 functions
+  m.def("wtsne", &wtsne_numpy<double>, py::return_value_policy::take_ownership,
         "Run stochastic cluster embedding", py::arg("I_vec"), py::arg("J_vec"),
         py::arg("dist_vec"), py::arg("weights"), py::arg("perplexity"),
         py::arg("maxIter"), py::arg("nRepuSamp") = 5, py::arg("eta0") = 1,
         py::arg("bInit") = 0, py::arg("animated") = false,
         py::arg("n_workers") = 128, py::arg("n_threads") = 1,
         py::arg("seed") = 1);
+  // Use fp32 for the embedding (halves memory traffic on Y, less accurate)
+  m.def("wtsne_fp32", &wtsne_numpy<float>, py::return_value_policy::take_ownership,
+        "Run stochastic cluster embedding in single precision",
+        py::arg("I_vec"), py::arg("J_vec"), py::arg("dist_vec"),
+        py::arg("weights"), py::arg("perplexity"), py::arg("maxIter"),
+        py::arg("nRepuSamp") = 5, py::arg("eta0") = 1, py::arg("bInit") = 0,
+        py::arg("animated") = false, py::arg("n_workers") = 128,
+        py::arg("n_threads") = 1, py::arg("seed") = 1);
 
-  m.def("pairsnp", &pairsnp, py::return_value_policy::take_ownership,
+  m.def("pairsnp", &pairsnp_numpy, py::return_value_policy::take_ownership,
         "Run pairsnp", py::arg("fasta"), py::arg("n_threads"), py::arg("dist"),
         py::arg("knn"));
 
+  m.def("jaccard", &jaccard_numpy, py::return_value_policy::take_ownership,
+        "Calculate sparse Jaccard distances", py::arg("packed"),
+        py::arg("knn"), py::arg("threshold"), py::arg("n_threads"));
+
   m.def("gen_audio", &sample_wave, py::return_value_policy::take_ownership,
         "Generate audio for animation", py::arg("frequencies"),
         py::arg("duration"), py::arg("sample_rate"), py::arg("n_threads"));
@@ -42,12 +125,10 @@ PYBIND11_MODULE(SCE, m) {
 #ifdef GPU_AVAILABLE
   // NOTE: python always uses fp64 so cannot easily template these (which
   // would just give one function name exported but with different type
-  // prototypes). To do this would require numpy (python)/Eigen (C++) which
-  // support both precisions. But easier just to stick with List (python)/
-  // std::vector (C++) and allow fp64->fp32 conversion when called
+  // prototypes). Instead the fp64 arrays are cast to fp32 when called
 
   // Use fp64 for double precision (slower, more accurate)
-  m.def("wtsne_gpu_fp64", &wtsne_gpu<double>,
+  m.def("wtsne_gpu_fp64", &wtsne_gpu_numpy<double>,
         py::return_value_policy::take_ownership,
         "Run stochastic cluster embedding with CUDA", py::arg("I_vec"),
         py::arg("J_vec"), py::arg("dist_vec"), py::arg("weights"),
@@ -57,7 +138,7 @@ PYBIND11_MODULE(SCE, m) {
         py::arg("cpu_threads") = 1, py::arg("device_id") = 0,
         py::arg("seed") = 1);
   // Use fp32 for single precision (faster, less accurate)
-  m.def("wtsne_gpu_fp32", &wtsne_gpu<float>,
+  m.def("wtsne_gpu_fp32", &wtsne_gpu_numpy<float>,
         py::return_value_policy::take_ownership,
         "Run stochastic cluster embedding with CUDA", py::arg("I_vec"),
         py::arg("J_vec"), py::arg("dist_vec"), py::arg("weights"),
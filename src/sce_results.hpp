@@ -30,6 +30,17 @@ public:
     }
   }
 
+  // fp32 embedding (CPU code), stored as fp64 for output
+  template <typename real_t>
+  void add_result(const uint64_t iter, const real_t Eq,
+                  const std::vector<float> &embedding) {
+    embedding_series_.emplace_back(embedding.cbegin(), embedding.cend());
+    if (make_animation_) {
+      iter_series_.push_back(iter * n_workers_);
+      eq_series_.push_back(Eq);
+    }
+  }
+
   bool is_sample_frame(const uint64_t iter) const {
     return make_animation_ && sample_it_ != sample_points_.cend() &&
            iter >= *sample_it_;
@@ -46,6 +57,17 @@ public:
     }
   }
 
+  template <typename real_t>
+  void add_frame(const uint64_t iter, const real_t Eq,
+                 const std::vector<float> &embedding) {
+    if (is_sample_frame(iter)) {
+      iter_series_.push_back(iter * n_workers_);
+      eq_series_.push_back(Eq);
+      embedding_series_.emplace_back(embedding.cbegin(), embedding.cend());
+      sample_it_++;
+    }
+  }
+
   bool is_animated() const { return make_animation_; }
   size_t n_frames() const { return eq_series_.size(); }
   std::tuple<std::vector<uint64_t>, std::vector<double>> get_eq() const {
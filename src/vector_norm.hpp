@@ -1,5 +1,6 @@
 #pragma once
 
+#include <algorithm>
 #include <limits>
 #include <stdexcept>
 #include <vector>
@@ -28,3 +29,15 @@ inline void normalise_vector(std::vector<T> &vec, const bool check_positive,
     vec[it] /= sum;
   }
 }
+
+template <typename T>
+std::vector<T> combine_vectors(const std::vector<std::vector<T>> &vec,
+                               const size_t len) {
+  std::vector<T> all(len);
+  auto all_it = all.begin();
+  for (size_t i = 0; i < vec.size(); ++i) {
+    std::copy(vec[i].cbegin(), vec[i].cend(), all_it);
+    all_it += vec[i].size();
+  }
+  return all;
+}
@@ -13,6 +13,7 @@
 #include <string.h>
 #include <tuple>
 #include <type_traits>
+#include <utility>
 #include <vector>
 
 #ifdef _OPENMP
@@ -181,16 +182,17 @@ wtsne_init(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
                    [](real_t yi) -> real_t { return yi * 1e-4; });
   }
 
-  return std::make_tuple(Y, P);
+  return std::make_tuple(std::move(Y), std::move(P));
 }
 
 // Function prototypes
 // in wtsne_cpu.cpp
+template <typename real_t>
 std::shared_ptr<sce_results>
 wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
-      std::vector<double> &dists, std::vector<double> &weights,
-      const double perplexity, const uint64_t maxIter, const uint64_t nRepuSamp,
-      const double eta0, const bool bInit, const bool animated,
+      std::vector<real_t> &dists, std::vector<real_t> &weights,
+      const real_t perplexity, const uint64_t maxIter, const uint64_t nRepuSamp,
+      const real_t eta0, const bool bInit, const bool animated,
       const int n_workers, const int n_threads, const unsigned int seed);
 // in wtsne_gpu.cu
 template <typename real_t>
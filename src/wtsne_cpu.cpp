@@ -3,16 +3,21 @@
 
 #include "wtsne.hpp"
 
+// real_t sets the precision of the embedding and the gradient updates.
+// The sampling tables, RNG and Eq are always kept in double precision, so
+// that edge indices and the Eq running sum are not truncated with fp32
+template <typename real_t>
 std::shared_ptr<sce_results>
 wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
-      std::vector<double> &dists, std::vector<double> &weights,
-      const double perplexity, const uint64_t maxIter, const uint64_t nRepuSamp,
-      const double eta0, const bool bInit, const bool animated,
+      std::vector<real_t> &dists, std::vector<real_t> &weights,
+      const real_t perplexity, const uint64_t maxIter, const uint64_t nRepuSamp,
+      const real_t eta0, const bool bInit, const bool animated,
       const int n_workers, const int n_threads, const unsigned int seed) {
   // Check input
-  std::vector<double> Y, P;
+  std::vector<real_t> Y;
+  std::vector<double> P;
   std::tie(Y, P) =
-      wtsne_init<double>(I, J, dists, weights, perplexity, n_threads, seed);
+      wtsne_init<real_t>(I, J, dists, weights, perplexity, n_threads, seed);
   uint64_t nn = weights.size();
   uint64_t ne = P.size();
 
@@ -20,8 +25,10 @@ wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
   auto results = std::make_shared<sce_results>(animated, n_workers, maxIter);
 
   // Set up random number generation
-  discrete_table<double> node_table(weights, n_threads);
-  discrete_table<double> edge_table(P, n_threads);
+  discrete_table<double, real_t> node_table(weights, n_threads);
+  // P is only needed to set up the edge table, so is moved into it
+  // (and freed) rather than being held for the whole optimisation
+  discrete_table<double> edge_table(std::move(P), n_threads);
   pRNG<double> rng_state(
       n_workers, xoshiro_initial_seed<double>(static_cast<uint32_t>(seed)));
 
@@ -32,45 +39,59 @@ wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
   unsigned long long int n_clashes = 0;
   results->add_frame(0, Eq, Y); // starting positions
 
+  // Nodes of the pairs drawn by each worker (attractive, then repulsive)
+  const uint64_t n_pairs = nRepuSamp + 1;
+  std::vector<uint64_t> k_draws(n_workers * n_pairs);
+  std::vector<uint64_t> l_draws(n_workers * n_pairs);
+
   using namespace std::literals;
   const auto start = std::chrono::steady_clock::now();
   for (uint64_t iter = 0; iter < maxIter; iter++) {
-    double eta = eta0 * (1 - (double)iter / maxIter);
+    real_t eta = eta0 * (1 - (double)iter / maxIter);
     eta = MAX(eta, eta0 * 1e-4);
     double c = 1.0 / (Eq * nsq);
 
     double qsum = 0;
     uint64_t qcount = 0;
 
-    double attrCoef = (bInit && iter < maxIter / 10) ? 8 : 2;
-    double repuCoef = 2 * c / nRepuSamp * nsq;
+    real_t attrCoef = (bInit && iter < maxIter / 10) ? 8 : 2;
+    real_t repuCoef = 2 * c / nRepuSamp * nsq;
 #pragma omp parallel for reduction(+ : qsum, qcount) num_threads(n_threads)
     for (int worker = 0; worker < n_workers; worker++) {
-      std::vector<double> dY(DIM);
-      std::vector<double> Yk_read(DIM);
-      std::vector<double> Yl_read(DIM);
+      // Stack arrays, to avoid heap allocations on every iteration
+      real_t dY[DIM];
+      real_t Yk_read[DIM];
+      real_t Yl_read[DIM];
 
       rng_state_t<double> &worker_rng = rng_state.state(worker);
+      uint64_t *k_draw = k_draws.data() + worker * n_pairs;
+      uint64_t *l_draw = l_draws.data() + worker * n_pairs;
       uint64_t e = edge_table.discrete_draw(worker_rng) % ne;
-      uint64_t i = I[e];
-      uint64_t j = J[e];
-
-      for (uint64_t r = 0; r < nRepuSamp + 1; r++) {
-        uint64_t k, l;
-        if (r == 0) {
-          k = i;
-          l = j;
-        } else {
-          k = node_table.discrete_draw(worker_rng) % nn;
-          l = node_table.discrete_draw(worker_rng) % nn;
-        }
+      k_draw[0] = I[e];
+      l_draw[0] = J[e];
+      for (uint64_t r = 1; r < n_pairs; r++) {
+        k_draw[r] = node_table.discrete_draw(worker_rng) % nn;
+        l_draw[r] = node_table.discrete_draw(worker_rng) % nn;
+      }
+
+      // Draw all the pairs first so that the rows of Y they need can be
+      // prefetched together. For large embeddings these are cache misses,
+      // which would otherwise be waited on one pair at a time
+      for (uint64_t r = 0; r < n_pairs; r++) {
+        __builtin_prefetch(Y.data() + k_draw[r] * DIM);
+        __builtin_prefetch(Y.data() + l_draw[r] * DIM);
+      }
+
+      for (uint64_t r = 0; r < n_pairs; r++) {
+        const uint64_t k = k_draw[r];
+        const uint64_t l = l_draw[r];
         if (k == l) {
           continue;
         }
 
         uint64_t lk = k * DIM;
         uint64_t ll = l * DIM;
-        double dist2 = 0.0;
+        real_t dist2 = 0.0;
         for (int d = 0; d < DIM; d++) {
 #pragma omp atomic read
           Yk_read[d] = Y[d + lk];
@@ -79,19 +100,19 @@ wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
           dY[d] = Yk_read[d] - Yl_read[d];
           dist2 += dY[d] * dY[d];
         }
-        double q = 1.0 / (1 + dist2);
+        real_t q = 1.0 / (1 + dist2);
 
-        double g;
+        real_t g;
         if (r == 0)
           g = -attrCoef * q;
         else
           g = repuCoef * q * q;
 
         bool overwrite = false;
-        double gain[DIM];
+        real_t gain[DIM];
         for (int d = 0; d < DIM; d++) {
           gain[d] = eta * g * dY[d];
-          double Yk_read_end, Yl_read_end;
+          real_t Yk_read_end, Yl_read_end;
 #pragma omp atomic capture
           Yk_read_end = Y[d + lk] += gain[d];
 #pragma omp atomic capture
@@ -114,6 +135,10 @@ wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
           }
 #pragma omp atomic update
           n_clashes++;
+          if (r > 0) {
+            k_draw[r] = node_table.discrete_draw(worker_rng) % nn;
+            l_draw[r] = node_table.discrete_draw(worker_rng) % nn;
+          }
           r--;
         }
       }
@@ -122,7 +147,8 @@ wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
     results->add_frame(iter, Eq, Y);
     if (iter % MAX(1, maxIter / 1000) == 0) {
       check_interrupts();
-      update_progress(iter, maxIter, eta, Eq, write_per_worker, n_clashes);
+      update_progress<double>(iter, maxIter, eta, Eq, write_per_worker,
+                              n_clashes);
     }
   }
   const auto end = std::chrono::steady_clock::now();
@@ -133,3 +159,14 @@ wtsne(const std::vector<uint64_t> &I, const std::vector<uint64_t> &J,
 
   return results;
 }
+
+template std::shared_ptr<sce_results>
+wtsne<double>(const std::vector<uint64_t> &, const std::vector<uint64_t> &,
+              std::vector<double> &, std::vector<double> &, const double,
+              const uint64_t, const uint64_t, const double, const bool,
+              const bool, const int, const int, const unsigned int);
+template std::shared_ptr<sce_results>
+wtsne<float>(const std::vector<uint64_t> &, const std::vector<uint64_t> &,
+             std::vector<float> &, std::vector<float> &, const float,
+             const uint64_t, const uint64_t, const float, const bool,
+             const bool, const int, const int, const unsigned int);
@@ -30,6 +30,7 @@ subprocess.run(python_cmd + " ../mandrake-runner.py --alignment sub5k_hiv_refs_p
 subprocess.run(python_cmd + " ../mandrake-runner.py --sketches listeria.h5 --kNN 50 --cpus 2 --maxIter 1000000", shell=True, check=True)
 subprocess.run(python_cmd + " ../mandrake-runner.py --sketches listeria.h5 --use-accessory --kNN 50 --cpus 2 --maxIter 1000000", shell=True, check=True)
 subprocess.run(python_cmd + " ../mandrake-runner.py --accessory gene_presence_absence.Rtab --kNN 50 --cpus 2 --maxIter 1000000", shell=True, check=True)
+subprocess.run(python_cmd + " ../mandrake-runner.py --accessory data/gene_presence_absence.Rtab.bz2 --kNN 50 --cpus 2 --maxIter 1000000", shell=True, check=True)
 
 sys.stderr.write("kNN and threshold both work\n")
 subprocess.run(python_cmd + " ../mandrake-runner.py --alignment sub5k_hiv_refs_prrt_trim.fas --threshold 0.1 --cpus 2 --maxIter 1000000", shell=True, check=True)
@@ -46,6 +47,8 @@ sys.stderr.write("Re-running with different SCE options\n")
 subprocess.run(python_cmd + " ../mandrake-runner.py --sketches listeria.h5 --kNN 50 --cpus 2 --maxIter 1000000", shell=True, check=True)
 subprocess.run(python_cmd + " ../mandrake-runner.py --distances mandrake.npz --maxIter 1000000 --eta0 2 --bInit 1 --perplexity 5", shell=True, check=True)
 subprocess.run(python_cmd + " ../mandrake-runner.py --distances mandrake.npz --maxIter 1000000 --animate --animate-sound --output animation", shell=True, check=True)
+subprocess.run(python_cmd + " ../mandrake-runner.py --distances mandrake.npz --maxIter 1000000 --fp 32", shell=True, check=True)
+subprocess.run(python_cmd + " ../mandrake-runner.py --distances mandrake.npz --maxIter 1000000 --fp 32 --animate --output animation_fp32", shell=True, check=True)
 subprocess.run(python_cmd + " ../mandrake-runner.py --distances mandrake.npz --maxIter 1000000 --labels data/labels.txt", shell=True, check=True)
 subprocess.run(python_cmd + " ../mandrake-runner.py --distances mandrake.npz --maxIter 1000000 --weight-file data/weights.txt", shell=True, check=True)
 